@@ -0,0 +1,88 @@
+"""
+Пакет для работы с API МойСклад
+MS doc: https://dev.moysklad.ru/doc/api/remap/1.2/documents/
+Пока что в данном пакете реализованы классы для
+работы со следующими сущностями:
+  - Заказ;
+  - перемещение;
+  - оприходование
+  - списания;
+  - товаров;
+  - отгрузок;
+  - счетов поставщиков
+Работа с ними разделяется на оперирование с единчными
+сущностми и на оперирование со списком сущностей.
+Методы работы с единичными сущностями:
+  - Получение позиций сущности;
+  - получение доп. аттрибуты;
+  - получение сырые данные;
+  - удаление сущности;
+  - внесение в сущность изменений
+
+Подмодули (transport, query, entities, lists, stocks, reports) импортируются лениво —
+при первом обращении к экспортируемому имени, а HTTP-сессия создаётся
+при первом запросе (см. `MS.transport.get_session`).
+
+TODO: Реализовать создание документов:
+- списания
+- счет поставщика
+- отгрузки
+
+"""
+from importlib import import_module
+
+
+_LAZY = {
+    'MoySkladConnector': 'transport',
+    'get_session': 'transport',
+    'Query': 'query',
+    'CurrentStocksQuery': 'query',
+    'Stocks': 'stocks',
+    'Reports': 'reports',
+    'ReportCache': 'reports',
+    'Position': 'entities',
+    'Entity': 'entities',
+    'NewPositions': 'entities',
+    'Product': 'entities',
+    'CustomerOrder': 'entities',
+    'Move': 'entities',
+    'Supply': 'entities',
+    'Loss': 'entities',
+    'InvoiceIn': 'entities',
+    'Demand': 'entities',
+    'Organization': 'entities',
+    'Counterparty': 'entities',
+    'Store': 'entities',
+    'EntitiesList': 'lists',
+    'Assortment': 'lists',
+    'MovesList': 'lists',
+    'CustomerOrdersList': 'lists',
+    'SuppliesList': 'lists',
+    'LossList': 'lists',
+    'InvoiceInList': 'lists',
+    'DemandsList': 'lists',
+    'ProductsList': 'lists',
+    'OrganizationsList': 'lists',
+    'CounterpartiesList': 'lists',
+    'StoresList': 'lists',
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name: str):
+    if name == 'session':
+        # совместимость: раньше `MS.session` создавалась при импорте
+        from .transport import get_session
+        return get_session()
+    if name in _LAZY:
+        value = getattr(import_module(f'.{_LAZY[name]}', __name__), name)
+        globals()[name] = value
+        return value
+    if name in set(_LAZY.values()):
+        return import_module(f'.{name}', __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
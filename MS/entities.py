@@ -1,151 +1,9 @@
-"""
-Пакет для работы с API МойСклад
-MS doc: https://dev.moysklad.ru/doc/api/remap/1.2/documents/
-Пока что в данном пакете реализованы классы для
-работы со следующими сущностями:
-  - Заказ;
-  - перемещение;
-  - оприходование
-  - списания;
-  - товаров;
-  - отгрузок;
-  - счетов поставщиков
-Работа с ними разделяется на оперирование с единчными
-сущностми и на оперирование со списком сущностей.
-Методы работы с единичными сущностями:
-  - Получение позиций сущности;
-  - получение доп. аттрибуты;
-  - получение сырые данные;
-  - удаление сущности;
-  - внесение в сущность изменений
-
-TODO: Реализовать создание документов:
-- списания
-- счет поставщика
-- отгрузки
-
+""" Единичные сущности и документы МС
+https://dev.moysklad.ru/doc/api/remap/1.2/documents/
 """
 from typing import Dict, List, Union, Optional
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util import Retry
-import ujson
-
-session = requests.Session()
-retry = Retry(connect=4, backoff_factor=1)
-adapter = HTTPAdapter(max_retries=retry)
-session.mount('http://', adapter)
-session.mount('https://', adapter)
-
-
-class MoySkladConnector:
-    """ Коннекто МС для формирования хедеров """
-    ms_base_url = 'https://online.moysklad.ru/api/remap/1.2'
-
-    def __init__(self, token: str):
-        self.token = token
-        self.ms_headers = {
-            "Authorization": self.token,
-            "Content-Type": "application/json",
-            "Connection": "keep-alive"
-        }
-
-
-class Stocks:
-    """ Класс для получения остатков с МС """
-
-    def __init__(self, msconnector: MoySkladConnector):
-        self.MS_STOCKS_BASE_URL = f"{msconnector.ms_base_url}/report/stock"
-        self.headers = msconnector.ms_headers
-
-    def get_stocks(self,
-                   limit: int = None,
-                   offset: int = None,
-                   filters: str = None,
-                   expand: str = None,
-                   group_by: str = 'variant'
-                   ) -> dict:
-        """ Получить остатки
-        https://dev.moysklad.ru/doc/api/remap/1.2/reports/#otchety-otchet-ostatki-poluchit-ostatki
-
-        Args:
-            limit (int, optional): Максимальное количество сущностей для
-            извлечения. Defaults to None.
-            offset (int, optional): Отступ в выдаваемом списке сущностей.
-            Defaults to None.
-            filters (str, optional): фильтры. Defaults to None.
-            groupBy (str, optional): тип, по которому нужно сгруппировать
-            выдачу (`variant`,`product`,`consignment`). Defaults to 'variant'.
-
-        Returns:
-            dict: _description_
-        """
-        url = f'{self.MS_STOCKS_BASE_URL}/all'
-        payload = {
-            "limit": limit,
-            "offset": offset,
-            "groupBy": group_by,
-            "filter": filters,
-            "expand": expand
-        }
-        return session.get(url=url, headers=self.headers, params=payload).json()
-
-    def get_stocks_bystore(self,
-                           limit: int = None,
-                           offset: int = None,
-                           filters: str = None,
-                           expand: str = None,
-                           group_by: str = 'variant'
-                           ) -> dict:
-        """ Остатки по складам
-        https://dev.moysklad.ru/doc/api/remap/1.2/reports/#otchety-otchet-ostatki-poluchit-ostatki-po-skladam
-
-        Args:
-            limit (int, optional): Максимальное количество сущностей для
-            извлечения. Defaults to None.
-            offset (int, optional): Отступ в выдаваемом списке сущностей.
-            Defaults to None.
-            filters (str, optional): фильтры. Defaults to None.
-            group_by (str, optional): тип, по которому нужно сгруппировать
-            выдачу ('product', 'variant', 'consignment'). Defaults to 'variant'.
-
-        Returns:
-            dict: _description_
-        """
-        url = f'{self.MS_STOCKS_BASE_URL}/bystore'
-        payload = {
-            "limit": limit,
-            "offset": offset,
-            "groupBy": group_by,
-            "filter": filters,
-            "expand": expand
-        }
-        return session.get(url=url, headers=self.headers, params=payload).json()
 
-    def get_current_stocks(self,
-                           mode: str = 'all',
-                           stockType: str = 'stock',
-                           filters: str = None,
-                           expand: str = None
-                           ) -> dict:
-        """ Текущие остатки
-        https://dev.moysklad.ru/doc/api/remap/1.2/reports/#otchety-otchet-ostatki-tekuschie-ostatki
-
-        Args:
-            mode (str, optional): `all` или `bystore`. Defaults to 'all'.
-            stockType (str, optional): `stock`, `freeStock`или `quantity`. Defaults to 'stock'.
-            filters (str, optional): `assortmentId` и `storeId`. Defaults to None.
-
-        Returns:
-            dict: _description_
-        """
-        url = f'{self.MS_STOCKS_BASE_URL}/{mode}/current'
-        payload = {
-            "stockType": stockType,
-            "filter": filters,
-            "expand": expand
-        }
-        return session.get(url=url, headers=self.headers, params=payload).json()
+from .transport import MoySkladConnector, dumps, get_session
 
 
 class Position:
@@ -172,9 +30,9 @@ class Position:
     def raw_data(self):
         """ Словарь с сырыми данными """
         payload = {"expand": "assortment"}
-        return session.get(url=self.entity_position_url,
-                           headers=self.headers,
-                           params=payload).json()
+        return get_session().get(url=self.entity_position_url,
+                                 headers=self.headers,
+                                 params=payload).json()
 
     @property
     def assortment(self):
@@ -182,8 +40,8 @@ class Position:
         return self.raw_data['assortment']
 
     def delete(self):
-        return session.delete(self.entity_position_url,
-                              headers=self.headers)
+        return get_session().delete(self.entity_position_url,
+                                    headers=self.headers)
 #! <---------- Single entity ------------------------------------------------->
 
 
@@ -214,9 +72,9 @@ class Entity:
     def get_raw(self, expand: str = None) -> Dict:
         """ Получение сырых данных """
         payload = {"expand": expand}
-        return session.get(url=self.url,
-                           headers=self.headers,
-                           params=payload).json()
+        return get_session().get(url=self.url,
+                                 headers=self.headers,
+                                 params=payload).json()
 
     def positions(self, expand: str = 'positions.assortment') -> List:
         """ Дёргает позиции документа
@@ -231,26 +89,26 @@ class Entity:
         return [Position(self.msconnector,
                          raw_data=position,
                          url=self.url
-                         ) for position in session.get(url=f"{self.url}/positions",
-                                                       headers=self.headers,
-                                                       params=payload).json().get('rows')]
+                         ) for position in get_session().get(url=f"{self.url}/positions",
+                                                             headers=self.headers,
+                                                             params=payload).json().get('rows')]
 
     @property
     def attributes_list(self) -> Dict:
         """ получить список доп. полей документа """
-        return session.get(url=self.attrs_list_url, headers=self.headers).json().get('rows')
+        return get_session().get(url=self.attrs_list_url, headers=self.headers).json().get('rows')
 
     def get_attribute(self, attr_id: str) -> Dict:
         """ получить конкретное поле документа по id аттрибута """
-        return session.get(url=f"{self.attrs_list_url}/{attr_id}", headers=self.headers).json()
+        return get_session().get(url=f"{self.attrs_list_url}/{attr_id}", headers=self.headers).json()
 
     def delete(self):
         """ удалить данный документ """
-        return session.delete(url=self.url, headers=self.headers)
+        return get_session().delete(url=self.url, headers=self.headers)
 
     def put_data(self, raw_data: Dict):
         """ Запрос на изменение документа """
-        return session.put(url=self.url, headers=self.headers, data=raw_data)
+        return get_session().put(url=self.url, headers=self.headers, data=raw_data)
 
 
 class NewPositions:
@@ -287,8 +145,8 @@ class NewPositions:
     def save(self):
         """ сохраняет новые позиции в документе
         """
-        payload = ujson.dumps(self.positions)
-        return session.post(f"{self.url}/positions", headers=self.headers, data=payload)
+        payload = dumps(self.positions)
+        return get_session().post(f"{self.url}/positions", headers=self.headers, data=payload)
 
 
 class Product(Entity):
@@ -358,12 +216,12 @@ class CustomerOrder(Entity):
         Returns:
             Response: ответ на создание заказа
         """
-        payload = ujson.dumps({
+        payload = dumps({
             "name": name,
             "organization": organization,
             "agent": agent
         })
-        return session.post(url=self.url, headers=self.headers, data=payload)
+        return get_session().post(url=self.url, headers=self.headers, data=payload)
 
     def demands(self, expand: str = None) -> List[Dict]:
         """_summary_
@@ -378,7 +236,7 @@ class CustomerOrder(Entity):
             "expand": expand
         }
         return [
-            session.get(
+            get_session().get(
                 url=demand.get('meta', {}).get('href'),
                 headers=self.headers,
                 params=payload
@@ -417,7 +275,7 @@ class Move(Entity):
         }
         if move_name:
             payload['name'] = move_name
-        return session.post(url=self.url, headers=self.headers, data=ujson.dumps(payload))
+        return get_session().post(url=self.url, headers=self.headers, data=dumps(payload))
 
 
 class Supply(Entity):
@@ -451,7 +309,7 @@ class Supply(Entity):
         }
         if supply_name:
             payload['name'] = supply_name
-        return session.post(url=self.url, headers=self.headers, data=ujson.dumps(payload))
+        return get_session().post(url=self.url, headers=self.headers, data=dumps(payload))
 
 
 class Loss(Entity):
@@ -578,138 +436,3 @@ class Store(Entity):
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__} <{self.raw['name']}> <id:{self.id}>"
-
-#! <---------- Entities by list ---------------------------------------------->
-
-
-class EntitiesList:
-    """ Абстрактный класс списка сущностей и документов
-
-    args:
-        msconnector (MoySkladConnector): коннектор МС
-    """
-
-    def __init__(self, msconnector: MoySkladConnector):
-        self.url = f"{msconnector.ms_base_url}/entity"
-        self.headers = msconnector.ms_headers
-        self.msconnector = msconnector
-
-    def get(self, limit: int = None, offset: int = None, filters: str = None, expand: str = None, next_href: str = None) -> List[Dict]:
-        """ Возвращает список документов
-
-        Args:
-            filters (str, optional): фильтры. Defaults to None.
-            next_href (str, optional): следующая ссылка для рекурсии. Defaults to None.
-            expand (str, optional): погружение в поле. Defaults to None.
-
-        Returns:
-            dict: товары, соответствующие запросу
-        """
-
-        payload = {
-            "limit": limit,
-            "offset": offset,
-            "filter": filters,
-            "expand": expand
-        }
-        response = session.get(
-            url=next_href or self.url, headers=self.headers, params=payload).json()
-        result = response.get('rows')
-        if response['meta'].get('nextHref') and not limit:
-            result.extend(self.get(next_href=response['meta']['nextHref']))
-        return result
-
-
-class Assortment(EntitiesList):
-    """ Список товаров (Почти то же, что и Products
-    только с остатками и возможностью отифильтровать
-    по складу) """
-
-    def __init__(self, msconnector: MoySkladConnector):
-        super().__init__(msconnector)
-        self.url = f"{self.url}/assortment"
-        self.headers = msconnector.ms_headers
-
-
-class MovesList(EntitiesList):
-    """ список перемещений """
-
-    def __init__(self, msconnector: MoySkladConnector):
-        super().__init__(msconnector)
-        self.url = f"{self.url}/move"
-
-
-class CustomerOrdersList(EntitiesList):
-    """ Список заказов покупателей """
-
-    def __init__(self, msconnector: MoySkladConnector):
-        super().__init__(msconnector)
-        self.url = f"{self.url}/customerorder"
-
-
-class SuppliesList(EntitiesList):
-    """ список оприходований """
-
-    def __init__(self, msconnector: MoySkladConnector):
-        super().__init__(msconnector)
-        self.url = f"{self.url}/supply"
-
-
-class LossList(EntitiesList):
-    """ список списаний """
-
-    def __init__(self, msconnector: MoySkladConnector):
-        super().__init__(msconnector)
-        self.url = f"{self.url}/loss"
-
-
-class InvoiceInList(EntitiesList):
-    """ список счетов поставщиков """
-
-    def __init__(self, msconnector: MoySkladConnector):
-        super().__init__(msconnector)
-        self.url = f"{self.url}/invoicein"
-
-
-class DemandsList(EntitiesList):
-    """ список отгрузок """
-
-    def __init__(self, msconnector: MoySkladConnector):
-        super().__init__(msconnector)
-        self.url = f"{self.url}/demand"
-
-
-class ProductsList(EntitiesList):
-    """ Список товаров """
-
-    def __init__(self, msconnector: MoySkladConnector):
-        super().__init__(msconnector)
-        self.url = f"{self.url}/product"
-
-
-class OrganizationsList(EntitiesList):
-    """ список организаций """
-
-    def __init__(self, msconnector: MoySkladConnector):
-        super().__init__(msconnector)
-        self.url = f"{self.url}/organization"
-
-
-class CounterpartiesList(EntitiesList):
-    """ Список контрагентов """
-
-    def __init__(self, msconnector: MoySkladConnector):
-        super().__init__(msconnector)
-        self.url = f"{self.url}/counterparty"
-
-
-class StoresList(EntitiesList):
-    """ Список складов """
-
-    def __init__(self, ms_connector: MoySkladConnector):
-        super().__init__(ms_connector)
-        self.url = f"{self.url}/store"
-
-
-if __name__ == "__main__":
-    msc = MoySkladConnector(MS_TOKEN)
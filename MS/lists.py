@@ -0,0 +1,238 @@
+""" Списки сущностей и документов МС """
+from typing import Dict, FrozenSet, List, Optional
+
+from .query import Query
+from .transport import MoySkladConnector, get_many, get_session
+
+
+# Поля фильтрации по документации API (раздел «Фильтрация» каждой сущности)
+ENTITY_FIELDS = frozenset({
+    'id', 'accountId', 'name', 'description', 'code', 'externalCode',
+    'updated', 'updatedBy', 'created', 'owner', 'group', 'shared',
+    'archived', 'syncId'
+})
+DOCUMENT_FIELDS = (ENTITY_FIELDS - {'archived'}) | frozenset({
+    'moment', 'applicable', 'organization', 'organizationAccount', 'agent',
+    'agentAccount', 'store', 'state', 'project', 'contract', 'sum', 'deleted',
+    'printed', 'published'
+})
+PRODUCT_FIELDS = ENTITY_FIELDS | {
+    'article', 'barcode', 'pathName', 'productFolder', 'supplier', 'uom',
+    'weight', 'volume', 'weighed', 'isSerialTrackable'
+}
+
+
+#! <---------- Entities by list ---------------------------------------------->
+
+
+class EntitiesList:
+    """ Абстрактный класс списка сущностей и документов
+
+    args:
+        msconnector (MoySkladConnector): коннектор МС
+    """
+
+    filter_fields: Optional[FrozenSet[str]] = None
+
+    def __init__(self, msconnector: MoySkladConnector):
+        self.url = f"{msconnector.ms_base_url}/entity"
+        self.headers = msconnector.ms_headers
+        self.msconnector = msconnector
+
+    def get(self,
+            limit: int = None,
+            offset: int = None,
+            filters: str = None,
+            expand: str = None,
+            next_href: str = None,
+            query: Query = None,
+            validate: bool = False
+            ) -> List[Dict]:
+        """ Возвращает список документов
+
+        Args:
+            filters (str, optional): фильтры. Defaults to None.
+            next_href (str, optional): следующая ссылка для рекурсии. Defaults to None.
+            expand (str, optional): погружение в поле. Defaults to None.
+            query (Query, optional): запрос (filter, order, search, expand);
+            заменяет остальные параметры. Defaults to None.
+            validate (bool, optional): проверить поля запроса по
+            метаданным сущности. Defaults to False.
+
+        Returns:
+            dict: товары, соответствующие запросу
+        """
+        if query is not None:
+            return self._get_query(query, validate)
+
+        payload = {
+            "limit": limit,
+            "offset": offset,
+            "filter": filters,
+            "expand": expand
+        }
+        response = get_session().get(
+            url=next_href or self.url, headers=self.headers, params=payload).json()
+        result = response.get('rows')
+        if response['meta'].get('nextHref') and not limit:
+            result.extend(self.get(next_href=response['meta']['nextHref']))
+        return result
+
+    def _get_query(self, query: Query, validate: bool) -> List[Dict]:
+        """ Выполняет запрос; слишком длинный запрос делится на
+        несколько, которые выполняются параллельно, а строки
+        объединяются и упорядочиваются по `order` запроса """
+        if validate:
+            self.validate(query)
+        queries = query.split(self.url)
+        limit = query.params().get('limit')
+        responses = get_many(self.url, self.headers, [q.params() for q in queries])
+        result = []
+        for response in responses:
+            rows = response.get('rows')
+            if response['meta'].get('nextHref') and not limit:
+                rows.extend(self.get(next_href=response['meta']['nextHref']))
+            result.extend(rows)
+        if len(queries) > 1:
+            unique = {}
+            for row in result:
+                unique.setdefault(row.get('id'), row)
+            result = query.sort(list(unique.values()))
+        return result
+
+    def attributes(self) -> List[Dict]:
+        """ Доп. поля сущности из метаданных """
+        return get_session().get(url=f"{self.url}/metadata/attributes",
+                                 headers=self.headers).json().get('rows', [])
+
+    def validate(self, query: Query) -> Query:
+        """ Проверяет поля фильтра: стандартные по `filter_fields`,
+        доп. поля (href) — по метаданным сущности. Поля сортировки
+        не проверяются
+
+        Raises:
+            ValueError: в запросе есть неизвестные поля
+        """
+        attributes = []
+        if any(field.startswith('http') for field in query.filter_fields):
+            attributes = [attr['meta']['href'] for attr in self.attributes()]
+        return query.validate(self.filter_fields, attributes)
+
+
+class Assortment(EntitiesList):
+    """ Список товаров (Почти то же, что и Products
+    только с остатками и возможностью отифильтровать
+    по складу) """
+
+    filter_fields = PRODUCT_FIELDS | {
+        'type', 'stockStore', 'stockMode', 'stockMoment', 'quantityMode'
+    }
+
+    def __init__(self, msconnector: MoySkladConnector):
+        super().__init__(msconnector)
+        self.url = f"{self.url}/assortment"
+        self.headers = msconnector.ms_headers
+
+
+class MovesList(EntitiesList):
+    """ список перемещений """
+
+    filter_fields = DOCUMENT_FIELDS | {
+        'sourceStore', 'targetStore', 'customerOrder', 'internalOrder'
+    }
+
+    def __init__(self, msconnector: MoySkladConnector):
+        super().__init__(msconnector)
+        self.url = f"{self.url}/move"
+
+
+class CustomerOrdersList(EntitiesList):
+    """ Список заказов покупателей """
+
+    filter_fields = DOCUMENT_FIELDS | {'deliveryPlannedMoment', 'salesChannel'}
+
+    def __init__(self, msconnector: MoySkladConnector):
+        super().__init__(msconnector)
+        self.url = f"{self.url}/customerorder"
+
+
+class SuppliesList(EntitiesList):
+    """ список оприходований """
+
+    filter_fields = DOCUMENT_FIELDS | {'incomingNumber', 'incomingDate'}
+
+    def __init__(self, msconnector: MoySkladConnector):
+        super().__init__(msconnector)
+        self.url = f"{self.url}/supply"
+
+
+class LossList(EntitiesList):
+    """ список списаний """
+
+    filter_fields = DOCUMENT_FIELDS
+
+    def __init__(self, msconnector: MoySkladConnector):
+        super().__init__(msconnector)
+        self.url = f"{self.url}/loss"
+
+
+class InvoiceInList(EntitiesList):
+    """ список счетов поставщиков """
+
+    filter_fields = DOCUMENT_FIELDS | {'incomingNumber', 'incomingDate', 'paymentPlannedMoment'}
+
+    def __init__(self, msconnector: MoySkladConnector):
+        super().__init__(msconnector)
+        self.url = f"{self.url}/invoicein"
+
+
+class DemandsList(EntitiesList):
+    """ список отгрузок """
+
+    filter_fields = DOCUMENT_FIELDS | {'customerOrder', 'salesChannel'}
+
+    def __init__(self, msconnector: MoySkladConnector):
+        super().__init__(msconnector)
+        self.url = f"{self.url}/demand"
+
+
+class ProductsList(EntitiesList):
+    """ Список товаров """
+
+    filter_fields = PRODUCT_FIELDS
+
+    def __init__(self, msconnector: MoySkladConnector):
+        super().__init__(msconnector)
+        self.url = f"{self.url}/product"
+
+
+class OrganizationsList(EntitiesList):
+    """ список организаций """
+
+    filter_fields = ENTITY_FIELDS | {'inn', 'legalTitle', 'email', 'phone'}
+
+    def __init__(self, msconnector: MoySkladConnector):
+        super().__init__(msconnector)
+        self.url = f"{self.url}/organization"
+
+
+class CounterpartiesList(EntitiesList):
+    """ Список контрагентов """
+
+    filter_fields = ENTITY_FIELDS | {
+        'inn', 'legalTitle', 'email', 'phone', 'tags', 'companyType', 'state'
+    }
+
+    def __init__(self, msconnector: MoySkladConnector):
+        super().__init__(msconnector)
+        self.url = f"{self.url}/counterparty"
+
+
+class StoresList(EntitiesList):
+    """ Список складов """
+
+    filter_fields = ENTITY_FIELDS | {'address', 'parent', 'pathName'}
+
+    def __init__(self, ms_connector: MoySkladConnector):
+        super().__init__(ms_connector)
+        self.url = f"{self.url}/store"
@@ -0,0 +1,268 @@
+""" Построитель запросов: filter, order, search, expand
+https://dev.moysklad.ru/doc/api/remap/1.2/#mojsklad-json-api-obschie-swedeniq-fil-traciq-wyborki-s-pomosch-u-parametra-filter
+
+Все условия отбора передаются на сервер. Если строка запроса
+получается слишком длинной (например, фильтр по сотням `id`),
+`Query.split` разбивает самое длинное условие `=` на несколько запросов,
+результаты которых затем объединяются (см. `MS.transport.get_many`).
+"""
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlencode
+
+
+MAX_URL_LENGTH = 4096
+
+OPERATORS = ('=', '!=', '>', '<', '>=', '<=', '~', '~=', '=~')
+DIRECTIONS = ('asc', 'desc')
+
+
+class _Condition:
+    """ Условие фильтра. Несколько значений при `sep=';'` повторяют
+    условие для каждого значения, при `sep=','` перечисляются
+    через запятую (`assortmentId=id1,id2`) """
+
+    def __init__(self, field: str, op: str, values: List[str], sep: str = ';'):
+        self.field = field
+        self.op = op
+        self.values = values
+        self.sep = sep
+
+    def __str__(self) -> str:
+        if self.sep == ',':
+            return f"{self.field}{self.op}{','.join(self.values)}"
+        return ';'.join(f"{self.field}{self.op}{value}" for value in self.values)
+
+    def with_values(self, values: List[str]) -> '_Condition':
+        return _Condition(self.field, self.op, values, self.sep)
+
+    @property
+    def splittable(self) -> bool:
+        """ Условие можно разбить на части и объединить результаты:
+        МС объединяет повторы `field=value` и значения через запятую по ИЛИ,
+        повторы с остальными операторами — по И """
+        return len(self.values) > 1 and (self.op == '=' or self.sep == ',')
+
+
+def _serialize(value: Any) -> str:
+    """ Приводит значение фильтра к виду, который ожидает МС """
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, date):
+        return value.strftime('%Y-%m-%d 00:00:00')
+    if isinstance(value, dict):
+        return value.get('meta', value)['href']
+    return str(value)
+
+
+def _sort_key(value: Any) -> Tuple[int, Any]:
+    """ Ключ сортировки, не падающий на значениях разных типов:
+    сначала числа, затем строки, затем вложенные сущности (по имени
+    или href), затем остальное как строки """
+    if isinstance(value, (int, float)):
+        return (0, value)
+    if isinstance(value, str):
+        return (1, value)
+    if isinstance(value, dict):
+        return (2, str(value.get('name') or value.get('meta', {}).get('href', '')))
+    return (3, str(value))
+
+
+class Query:
+    """ Запрос к списку сущностей
+
+    Пример:
+        Query().filter('id', ids).filter('updated', since, '>=') \\
+               .order('moment', 'desc').expand('agent').limit(100)
+    """
+
+    def __init__(self):
+        self._conditions: List[_Condition] = []
+        self._order: List[Tuple[str, str]] = []
+        self._search: Optional[str] = None
+        self._expand: List[str] = []
+        self._limit: Optional[int] = None
+        self._offset: Optional[int] = None
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__} <{self.params()}>"
+
+    def _copy(self) -> 'Query':
+        query = self.__class__.__new__(self.__class__)
+        query.__dict__.update(self.__dict__)
+        query._conditions = list(self._conditions)
+        query._order = list(self._order)
+        query._expand = list(self._expand)
+        return query
+
+    def filter(self, field: str, value: Any, op: str = '=') -> 'Query':
+        """ Добавить условие фильтра
+
+        Args:
+            field (str): поле сущности или href доп. поля
+            value (Any): значение; словарь с `meta` заменяется на его href,
+            None — пустое значение. Для списка условие повторяется для
+            каждого значения: при `=` МС объединяет повторы по ИЛИ, при
+            остальных операторах — по И (`moment>=a;moment>=b`).
+            op (str, optional): оператор из `OPERATORS`. Defaults to '='.
+
+        Returns:
+            Query: этот же запрос
+        """
+        if op not in OPERATORS:
+            raise ValueError(f"Unknown filter operator {op!r}, expected one of {OPERATORS}")
+        values = value if isinstance(value, (list, tuple, set, frozenset)) else [value]
+        self._conditions.append(_Condition(field, op, [_serialize(v) for v in values]))
+        return self
+
+    def order(self, field: str, direction: str = 'asc') -> 'Query':
+        """ Сортировка по полю (`asc` или `desc`) """
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Unknown order direction {direction!r}, expected one of {DIRECTIONS}")
+        self._order.append((field, direction))
+        return self
+
+    def search(self, text: str) -> 'Query':
+        """ Контекстный поиск """
+        self._search = text
+        return self
+
+    def expand(self, *fields: str) -> 'Query':
+        """ Раскрыть вложенные сущности """
+        self._expand.extend(fields)
+        return self
+
+    def limit(self, limit: int) -> 'Query':
+        self._limit = limit
+        return self
+
+    def offset(self, offset: int) -> 'Query':
+        self._offset = offset
+        return self
+
+    @property
+    def filter_fields(self) -> List[str]:
+        """ Поля, участвующие в фильтре """
+        return [c.field for c in self._conditions]
+
+    def validate(self, allowed: Optional[Iterable[str]] = None,
+                 attributes: Iterable[str] = ()) -> 'Query':
+        """ Проверить поля фильтра по метаданным сущности
+
+        Args:
+            allowed (Iterable[str], optional): стандартные поля сущности.
+            None — стандартные поля не проверяются. Defaults to None.
+            attributes (Iterable[str], optional): href доп. полей сущности.
+
+        Raises:
+            ValueError: в запросе есть неизвестные поля
+
+        Returns:
+            Query: этот же запрос
+        """
+        attributes = set(attributes)
+        unknown = [
+            field for field in self.filter_fields
+            if field not in attributes
+            and (field.startswith('http') or (allowed is not None and field not in allowed))
+        ]
+        if unknown:
+            raise ValueError(f"Unknown fields for this entity: {', '.join(unknown)}")
+        return self
+
+    def sort(self, rows: List[Dict]) -> List[Dict]:
+        """ Упорядочить строки по `order` запроса (для объединения
+        результатов разбитого запроса); пустые значения — в конце.
+
+        Порядок по вложенным сущностям (`agent`, `store`, ...) лишь
+        приблизительный: они сравниваются по имени или href, а сервер
+        может сортировать иначе. """
+        for field, direction in reversed(self._order):
+            present = [row for row in rows if row.get(field) is not None]
+            missing = [row for row in rows if row.get(field) is None]
+            present.sort(key=lambda row: _sort_key(row[field]), reverse=direction == 'desc')
+            rows = present + missing
+        return rows
+
+    def params(self) -> Dict[str, Any]:
+        """ Параметры запроса для `requests` """
+        params = {}
+        if self._conditions:
+            params['filter'] = ';'.join(str(c) for c in self._conditions)
+        if self._order:
+            params['order'] = ';'.join(f"{field},{direction}" for field, direction in self._order)
+        if self._search is not None:
+            params['search'] = self._search
+        if self._expand:
+            params['expand'] = ','.join(self._expand)
+        if self._limit is not None:
+            params['limit'] = self._limit
+        if self._offset is not None:
+            params['offset'] = self._offset
+        return params
+
+    def url_length(self, url: str, extra: Optional[Dict[str, Any]] = None) -> int:
+        """ Длина итогового url с параметрами запроса и `extra` """
+        return len(url) + 1 + len(urlencode({**(extra or {}), **self.params()}))
+
+    def split(self, url: str, max_url_length: int = MAX_URL_LENGTH,
+              extra: Optional[Dict[str, Any]] = None) -> List['Query']:
+        """ Разбить запрос на несколько, чтобы url каждого уместился в лимит
+
+        Делится условие `=` (или со значениями через запятую) с наибольшим
+        количеством значений, обычно фильтр по `id`: результаты частей
+        объединяются по ИЛИ. Остальные условия копируются в каждый запрос.
+        Запрос с `limit`/`offset` не делится — они применялись бы к
+        каждой части отдельно.
+
+        Args:
+            url (str): адрес, к которому будут добавлены параметры
+            max_url_length (int, optional): максимальная длина url.
+            Defaults to MAX_URL_LENGTH.
+            extra (Dict, optional): параметры, которые будут добавлены
+            к каждой части помимо параметров запроса. Defaults to None.
+
+        Raises:
+            ValueError: запрос не удаётся уложить в лимит
+
+        Returns:
+            List[Query]: один или несколько запросов
+        """
+        if self.url_length(url, extra) <= max_url_length:
+            return [self]
+        if self._limit is not None or self._offset is not None:
+            raise ValueError("Query with limit/offset does not fit into "
+                             f"{max_url_length} characters and cannot be split")
+        splittable = [i for i, c in enumerate(self._conditions) if c.splittable]
+        if not splittable:
+            raise ValueError(f"Query does not fit into {max_url_length} characters "
+                             "and has no '=' condition with several values to split")
+        index = max(splittable, key=lambda i: len(self._conditions[i].values))
+        condition = self._conditions[index]
+        middle = len(condition.values) // 2
+        queries = []
+        for values in (condition.values[:middle], condition.values[middle:]):
+            query = self._copy()
+            query._conditions[index] = condition.with_values(values)
+            queries.extend(query.split(url, max_url_length, extra))
+        return queries
+
+
+class CurrentStocksQuery(Query):
+    """ Фильтр текущих остатков по `assortmentId` и `storeId`
+    https://dev.moysklad.ru/doc/api/remap/1.2/reports/#otchety-otchet-ostatki-tekuschie-ostatki
+    """
+
+    def assortment_id(self, *ids: str) -> 'CurrentStocksQuery':
+        """ Только указанные товары/модификации """
+        self._conditions.append(_Condition('assortmentId', '=', list(ids), sep=','))
+        return self
+
+    def store_id(self, *ids: str) -> 'CurrentStocksQuery':
+        """ Только указанные склады """
+        self._conditions.append(_Condition('storeId', '=', list(ids), sep=','))
+        return self
@@ -0,0 +1,443 @@
+""" Отчёты МС: прибыльность, обороты, продажи, показатели
+https://dev.moysklad.ru/doc/api/remap/1.2/reports/
+
+Строки отчётов выгружаются постранично: первая страница даёт общее
+количество строк, остальные запрашиваются параллельно (`stream`).
+Период отчёта делится на интервалы (день/месяц); закрытые интервалы
+кэшируются в `ReportCache`, заново запрашивается только текущий.
+Неполные интервалы на краях периода не кэшируются.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .query import Query
+from .transport import MAX_PARALLEL_REQUESTS, MoySkladConnector, get_many, get_session
+
+
+MOMENT_FORMAT = '%Y-%m-%d %H:%M:%S'
+BUCKETS = ('day', 'month')
+INTERVALS = ('hour', 'day', 'month')
+# время в API МС — московское
+MSK = timezone(timedelta(hours=3))
+PAGE_SIZE = 1000
+
+PROFIT_SUM_FIELDS = ('sellQuantity', 'sellSum', 'sellCostSum',
+                     'returnQuantity', 'returnSum', 'returnCostSum', 'profit')
+
+
+class ReportCache:
+    """ Кэш закрытых периодов отчётов
+
+    Args:
+        path (str, optional): каталог для хранения в json-файлах;
+        None — кэш только в памяти. Defaults to None.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._memory: Dict[str, Any] = {}
+        if path:
+            os.makedirs(path, exist_ok=True)
+
+    @staticmethod
+    def key(*parts: Any) -> str:
+        """ Ключ кэша по адресу отчёта, параметрам и границам периода """
+        raw = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """ Значение по ключу; отсутствующий или нечитаемый файл — промах """
+        if key in self._memory or not self.path:
+            return self._memory.get(key)
+        try:
+            with open(os.path.join(self.path, f"{key}.json"), encoding='utf-8') as file:
+                value = self._memory[key] = json.load(file)
+        except (OSError, ValueError):
+            return None
+        return value
+
+    def set(self, key: str, value: Any):
+        """ Сохранить значение; файл записывается во временный и атомарно
+        подменяется, чтобы параллельные процессы не читали его недописанным """
+        self._memory[key] = value
+        if self.path:
+            fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                    json.dump(value, file, ensure_ascii=False)
+                os.replace(tmp_path, os.path.join(self.path, f"{key}.json"))
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+
+    def clear(self):
+        """ Удалить все сохранённые периоды """
+        self._memory.clear()
+        if self.path:
+            for name in os.listdir(self.path):
+                if name.endswith('.json'):
+                    os.remove(os.path.join(self.path, name))
+
+
+def _query_params(query: Optional[Query]) -> Dict:
+    """ Параметры запроса к отчёту; страницы выгружает `Reports.stream`,
+    поэтому limit/offset в запросе не допускаются """
+    params = query.params() if query else {}
+    if 'limit' in params or 'offset' in params:
+        raise ValueError("Report queries are paged by Reports; limit/offset are not supported")
+    return params
+
+
+def _bucket_start(moment: datetime, bucket: str) -> datetime:
+    """ Начало интервала, в который попадает `moment` """
+    if bucket == 'day':
+        return datetime(moment.year, moment.month, moment.day)
+    return datetime(moment.year, moment.month, 1)
+
+
+def _bucket_end(start: datetime, bucket: str) -> datetime:
+    """ Начало следующего интервала после `start` """
+    if bucket == 'day':
+        return datetime(start.year, start.month, start.day) + timedelta(days=1)
+    if start.month == 12:
+        return datetime(start.year + 1, 1, 1)
+    return datetime(start.year, start.month + 1, 1)
+
+
+def _periods(moment_from: datetime, moment_to: datetime, bucket: str) -> List[Tuple[datetime, datetime]]:
+    """ Делит период на интервалы по границам дней или месяцев
+
+    Returns:
+        List[Tuple[datetime, datetime]]: (начало, конец) интервалов, конец включительно
+    """
+    if bucket not in BUCKETS:
+        raise ValueError(f"Unknown bucket {bucket!r}, expected one of {BUCKETS}")
+    periods = []
+    start = moment_from
+    while start <= moment_to:
+        boundary = _bucket_end(start, bucket)
+        periods.append((start, min(boundary - timedelta(seconds=1), moment_to)))
+        start = boundary
+    return periods
+
+
+def merge_profit(periods: List[List[Dict]]) -> List[Dict]:
+    """ Сводит строки прибыльности нескольких периодов в одну по позиции
+
+    Суммируемые поля (`PROFIT_SUM_FIELDS`) складываются, средние цены
+    и рентабельность пересчитываются:
+    `margin = profit / (sellCostSum - returnCostSum)`,
+    `salesMargin = profit / (sellSum - returnSum)`.
+    """
+    merged: Dict[str, Dict] = {}
+    for rows in periods:
+        for row in rows:
+            href = row['assortment']['meta']['href']
+            if href not in merged:
+                merged[href] = {'assortment': row['assortment'],
+                                **{field: 0 for field in PROFIT_SUM_FIELDS}}
+            for field in PROFIT_SUM_FIELDS:
+                merged[href][field] += row.get(field, 0)
+    for row in merged.values():
+        for kind in ('sell', 'return'):
+            quantity = row[f'{kind}Quantity']
+            row[f'{kind}Price'] = row[f'{kind}Sum'] / quantity if quantity else 0
+            row[f'{kind}Cost'] = row[f'{kind}CostSum'] / quantity if quantity else 0
+        cost = row['sellCostSum'] - row['returnCostSum']
+        revenue = row['sellSum'] - row['returnSum']
+        row['margin'] = row['profit'] / cost if cost else 0
+        row['salesMargin'] = row['profit'] / revenue if revenue else 0
+    return list(merged.values())
+
+
+def merge_turnover(periods: List[List[Dict]]) -> List[Dict]:
+    """ Сводит обороты нескольких периодов: остаток на начало — из
+    первого периода с позицией, на конец — из последнего, приход и
+    расход суммируются """
+    merged: Dict[str, Dict] = {}
+    for rows in periods:
+        for row in rows:
+            href = row['assortment']['meta']['href']
+            if href not in merged:
+                merged[href] = {
+                    'assortment': row['assortment'],
+                    'onPeriodStart': dict(row['onPeriodStart']),
+                    'income': {'quantity': 0, 'sum': 0},
+                    'outcome': {'quantity': 0, 'sum': 0},
+                }
+            current = merged[href]
+            current['onPeriodEnd'] = dict(row['onPeriodEnd'])
+            for field in ('income', 'outcome'):
+                current[field]['quantity'] += row[field]['quantity']
+                current[field]['sum'] += row[field]['sum']
+    return list(merged.values())
+
+
+class Reports:
+    """ Отчёты МС с постраничной параллельной выгрузкой и кэшем периодов
+
+    Args:
+        msconnector (MoySkladConnector): коннектор МС
+        cache (ReportCache, optional): кэш закрытых периодов; по
+        умолчанию — в памяти. Defaults to None.
+        page_size (int, optional): строк на страницу, от 1 до 1000.
+        Defaults to PAGE_SIZE.
+        tz (tzinfo, optional): часовой пояс аккаунта, в котором
+        определяется, закрыт ли интервал. Defaults to MSK.
+    """
+
+    def __init__(self,
+                 msconnector: MoySkladConnector,
+                 cache: Optional[ReportCache] = None,
+                 page_size: int = PAGE_SIZE,
+                 tz: tzinfo = MSK):
+        if not 1 <= page_size <= PAGE_SIZE:
+            raise ValueError(f"page_size must be between 1 and {PAGE_SIZE}, got {page_size}")
+        self.MS_REPORTS_BASE_URL = f"{msconnector.ms_base_url}/report"
+        self.headers = msconnector.ms_headers
+        self.cache = cache or ReportCache()
+        self.page_size = page_size
+        self.tz = tz
+        # записи кэша разных аккаунтов не должны пересекаться
+        self.account = hashlib.sha1(msconnector.token.encode()).hexdigest()
+
+    def _local(self, moment: datetime) -> datetime:
+        """ Момент без часового пояса по времени аккаунта: aware-datetime
+        переводится в `self.tz`, naive считается уже заданным в нём """
+        if moment.tzinfo is not None:
+            return moment.astimezone(self.tz).replace(tzinfo=None)
+        return moment
+
+    def stream(self, url: str, params: Dict) -> Iterator[Dict]:
+        """ Построчная выгрузка отчёта
+
+        Первая страница запрашивается отдельно, чтобы узнать `meta.size`,
+        остальные — пачками по `MAX_PARALLEL_REQUESTS` параллельно.
+        Порядок строк сохраняется.
+
+        Args:
+            url (str): адрес отчёта
+            params (Dict): параметры запроса без limit/offset
+
+        Raises:
+            ValueError: в параметрах есть limit или offset
+
+        Yields:
+            Dict: строки отчёта
+        """
+        if 'limit' in params or 'offset' in params:
+            raise ValueError("stream() pages the report itself; limit/offset are not supported")
+        params = {**params, 'limit': self.page_size}
+        response = get_session().get(url=url, headers=self.headers,
+                                     params={**params, 'offset': 0}).json()
+        yield from response.get('rows', [])
+        offsets = list(range(self.page_size, response['meta'].get('size', 0), self.page_size))
+        for i in range(0, len(offsets), MAX_PARALLEL_REQUESTS):
+            batch = [{**params, 'offset': offset}
+                     for offset in offsets[i:i + MAX_PARALLEL_REQUESTS]]
+            for page in get_many(url, self.headers, batch):
+                yield from page.get('rows', [])
+
+    def by_period(self,
+                  url: str,
+                  moment_from: datetime,
+                  moment_to: datetime,
+                  params: Optional[Dict] = None,
+                  bucket: str = 'month',
+                  fetch: Optional[Callable[[str, Dict], Any]] = None,
+                  refresh_from: Optional[datetime] = None
+                  ) -> List[Tuple[datetime, Any]]:
+        """ Данные отчёта по интервалам периода
+
+        Закрытые интервалы (день/месяц целиком в прошлом по времени
+        аккаунта) берутся из кэша, если есть, и кэшируются после
+        загрузки. Открытый интервал и неполные интервалы на краях
+        периода запрашиваются всегда.
+
+        Args:
+            url (str): адрес отчёта
+            moment_from (datetime): начало периода; naive — по времени
+            аккаунта, aware переводится в `tz`
+            moment_to (datetime): конец периода (включительно), как `moment_from`
+            params (Dict, optional): прочие параметры. Defaults to None.
+            bucket (str, optional): `day` или `month`. Defaults to 'month'.
+            fetch (Callable, optional): загрузка одного интервала по (url, params);
+            по умолчанию — все строки через `stream`. Defaults to None.
+            refresh_from (datetime, optional): интервалы, начиная с этого
+            момента, запрашиваются заново и перезаписываются в кэше
+            (задним числом проведённые документы, пересчёт себестоимости).
+            Defaults to None.
+
+        Returns:
+            List[Tuple[datetime, Any]]: (начало интервала, данные)
+        """
+        params = params or {}
+        fetch = fetch or (lambda url, params: list(self.stream(url, params)))
+        now = datetime.now(self.tz).replace(tzinfo=None)
+        moment_from, moment_to = self._local(moment_from), self._local(moment_to)
+        if refresh_from is not None:
+            refresh_from = _bucket_start(self._local(refresh_from), bucket)
+        result = []
+        for start, end in _periods(moment_from, moment_to, bucket):
+            period_params = {**params,
+                             'momentFrom': start.strftime(MOMENT_FORMAT),
+                             'momentTo': end.strftime(MOMENT_FORMAT)}
+            boundary = _bucket_end(start, bucket)
+            cacheable = (boundary <= now
+                         and start == _bucket_start(start, bucket)
+                         and end == boundary - timedelta(seconds=1))
+            key = ReportCache.key(self.account, url, period_params)
+            refresh = refresh_from is not None and start >= refresh_from
+            data = self.cache.get(key) if cacheable and not refresh else None
+            if data is None:
+                data = fetch(url, period_params)
+                if cacheable:
+                    self.cache.set(key, data)
+            result.append((start, data))
+        return result
+
+    def _profit(self, kind: str, moment_from: datetime, moment_to: datetime,
+                query: Query = None, bucket: str = 'month',
+                refresh_from: Optional[datetime] = None) -> List[Dict]:
+        url = f"{self.MS_REPORTS_BASE_URL}/profit/{kind}"
+        params = _query_params(query)
+        periods = self.by_period(url, moment_from, moment_to, params, bucket,
+                                 refresh_from=refresh_from)
+        return merge_profit([rows for _, rows in periods])
+
+    def profit_by_product(self,
+                          moment_from: datetime,
+                          moment_to: datetime,
+                          query: Query = None,
+                          bucket: str = 'month',
+                          refresh_from: Optional[datetime] = None
+                          ) -> List[Dict]:
+        """ Прибыльность по товарам
+        https://dev.moysklad.ru/doc/api/remap/1.2/reports/#otchety-otchet-pribyl-nost
+
+        Args:
+            moment_from (datetime): начало периода
+            moment_to (datetime): конец периода
+            query (Query, optional): фильтры (`store`, `project`,
+            `counterparty`, ...). Defaults to None.
+            bucket (str, optional): интервал кэширования. Defaults to 'month'.
+            refresh_from (datetime, optional): перезапросить закэшированные
+            интервалы с этого момента. Defaults to None.
+
+        Returns:
+            List[Dict]: строки отчёта за весь период
+        """
+        return self._profit('byproduct', moment_from, moment_to, query, bucket, refresh_from)
+
+    def profit_by_variant(self,
+                          moment_from: datetime,
+                          moment_to: datetime,
+                          query: Query = None,
+                          bucket: str = 'month',
+                          refresh_from: Optional[datetime] = None
+                          ) -> List[Dict]:
+        """ Прибыльность по модификациям
+
+        Args:
+            moment_from (datetime): начало периода
+            moment_to (datetime): конец периода
+            query (Query, optional): фильтры. Defaults to None.
+            bucket (str, optional): интервал кэширования. Defaults to 'month'.
+            refresh_from (datetime, optional): перезапросить закэшированные
+            интервалы с этого момента. Defaults to None.
+
+        Returns:
+            List[Dict]: строки отчёта за весь период
+        """
+        return self._profit('byvariant', moment_from, moment_to, query, bucket, refresh_from)
+
+    def turnover(self,
+                 moment_from: datetime,
+                 moment_to: datetime,
+                 group_by: str = 'product',
+                 query: Query = None,
+                 bucket: str = 'month',
+                 refresh_from: Optional[datetime] = None
+                 ) -> List[Dict]:
+        """ Обороты по товарам
+        https://dev.moysklad.ru/doc/api/remap/1.2/reports/#otchety-otchet-oboroty
+
+        Args:
+            moment_from (datetime): начало периода
+            moment_to (datetime): конец периода
+            group_by (str, optional): `product` или `variant`. Defaults to 'product'.
+            query (Query, optional): фильтры (`store`, `product`, ...). Defaults to None.
+            bucket (str, optional): интервал кэширования. Defaults to 'month'.
+            refresh_from (datetime, optional): перезапросить закэшированные
+            интервалы с этого момента. Defaults to None.
+
+        Returns:
+            List[Dict]: строки отчёта за весь период
+        """
+        url = f"{self.MS_REPORTS_BASE_URL}/turnover/all"
+        params = {'groupBy': group_by, **_query_params(query)}
+        periods = self.by_period(url, moment_from, moment_to, params, bucket,
+                                 refresh_from=refresh_from)
+        return merge_turnover([rows for _, rows in periods])
+
+    def sales_by_period(self,
+                        moment_from: datetime,
+                        moment_to: datetime,
+                        interval: str = 'day',
+                        query: Query = None,
+                        bucket: str = 'month',
+                        refresh_from: Optional[datetime] = None
+                        ) -> List[Dict]:
+        """ Продажи по периодам (показатели продаж)
+        https://dev.moysklad.ru/doc/api/remap/1.2/reports/#otchety-pokazateli-prodazh-i-zakazow
+
+        Args:
+            moment_from (datetime): начало периода
+            moment_to (datetime): конец периода
+            interval (str, optional): `hour`, `day` или `month`, не крупнее
+            `bucket`. Defaults to 'day'.
+            query (Query, optional): фильтры. Defaults to None.
+            bucket (str, optional): интервал кэширования. Defaults to 'month'.
+            refresh_from (datetime, optional): перезапросить закэшированные
+            интервалы с этого момента. Defaults to None.
+
+        Raises:
+            ValueError: `interval` крупнее `bucket` — точки интервала
+            дробились бы по интервалам кэширования
+
+        Returns:
+            List[Dict]: точки ряда (`date`, `quantity`, `sum`)
+        """
+        if interval not in INTERVALS:
+            raise ValueError(f"Unknown interval {interval!r}, expected one of {INTERVALS}")
+        if bucket not in BUCKETS:
+            raise ValueError(f"Unknown bucket {bucket!r}, expected one of {BUCKETS}")
+        if INTERVALS.index(interval) > INTERVALS.index(bucket):
+            raise ValueError(f"Interval {interval!r} is coarser than bucket {bucket!r}")
+        url = f"{self.MS_REPORTS_BASE_URL}/sales/plotseries"
+        params = {'interval': interval, **_query_params(query)}
+
+        def fetch(url: str, params: Dict) -> List[Dict]:
+            return get_session().get(url=url, headers=self.headers,
+                                     params=params).json().get('series', [])
+
+        periods = self.by_period(url, moment_from, moment_to, params, bucket, fetch,
+                                 refresh_from)
+        return [point for _, series in periods for point in series]
+
+    def dashboard(self, period: str = 'day') -> Dict:
+        """ Показатели (dashboard), не кэшируются
+        https://dev.moysklad.ru/doc/api/remap/1.2/reports/#otchety-pokazateli
+
+        Args:
+            period (str, optional): `day`, `week` или `month`. Defaults to 'day'.
+
+        Returns:
+            Dict: показатели продаж, заказов и денег
+        """
+        url = f"{self.MS_REPORTS_BASE_URL}/dashboard/{period}"
+        return get_session().get(url=url, headers=self.headers).json()
@@ -0,0 +1,145 @@
+""" Отчёты по остаткам
+https://dev.moysklad.ru/doc/api/remap/1.2/reports/#otchety-otchet-ostatki
+"""
+from typing import Any, Dict
+
+from .query import Query
+from .transport import MoySkladConnector, get_many, get_session
+
+
+class Stocks:
+    """ Класс для получения остатков с МС """
+
+    def __init__(self, msconnector: MoySkladConnector):
+        self.MS_STOCKS_BASE_URL = f"{msconnector.ms_base_url}/report/stock"
+        self.headers = msconnector.ms_headers
+
+    def _get(self, url: str, payload: Dict, query: Query = None) -> Any:
+        """ GET с параметрами из `payload` либо из `query`; длинный
+        запрос делится на несколько, ответы объединяются. Каждая часть
+        разбитого запроса выгружается целиком (по `nextHref`), поэтому
+        в объединённом ответе нет ссылок на страницы """
+        if query is None:
+            return get_session().get(url=url, headers=self.headers, params=payload).json()
+        params = {key: value for key, value in payload.items()
+                  if key not in ('filter', 'expand') and value is not None}
+        queries = query.split(url, extra=params)
+        if len(queries) > 1 and ('limit' in params or 'offset' in params):
+            raise ValueError("Query with limit/offset is too long and cannot be split")
+        responses = get_many(url, self.headers, [{**params, **q.params()} for q in queries])
+        if len(queries) == 1:
+            return responses[0]
+        if isinstance(responses[0], list):
+            return [row for response in responses for row in response]
+        rows = []
+        for response in responses:
+            rows.extend(response.get('rows', []))
+            next_href = response['meta'].get('nextHref')
+            while next_href:
+                page = get_session().get(url=next_href, headers=self.headers).json()
+                rows.extend(page.get('rows', []))
+                next_href = page['meta'].get('nextHref')
+        meta = {key: value for key, value in responses[0]['meta'].items()
+                if key not in ('nextHref', 'previousHref', 'limit', 'offset')}
+        meta['size'] = len(rows)
+        return {**responses[0], 'meta': meta, 'rows': query.sort(rows)}
+
+    def get_stocks(self,
+                   limit: int = None,
+                   offset: int = None,
+                   filters: str = None,
+                   expand: str = None,
+                   group_by: str = 'variant',
+                   query: Query = None
+                   ) -> dict:
+        """ Получить остатки
+        https://dev.moysklad.ru/doc/api/remap/1.2/reports/#otchety-otchet-ostatki-poluchit-ostatki
+
+        Args:
+            limit (int, optional): Максимальное количество сущностей для
+            извлечения. Defaults to None.
+            offset (int, optional): Отступ в выдаваемом списке сущностей.
+            Defaults to None.
+            filters (str, optional): фильтры. Defaults to None.
+            groupBy (str, optional): тип, по которому нужно сгруппировать
+            выдачу (`variant`,`product`,`consignment`). Defaults to 'variant'.
+            query (Query, optional): фильтры/expand через построитель запросов
+            (`store`, `product`, `stockMode`, ...); заменяет `filters` и `expand`.
+            Defaults to None.
+
+        Returns:
+            dict: _description_
+        """
+        url = f'{self.MS_STOCKS_BASE_URL}/all'
+        payload = {
+            "limit": limit,
+            "offset": offset,
+            "groupBy": group_by,
+            "filter": filters,
+            "expand": expand
+        }
+        return self._get(url, payload, query)
+
+    def get_stocks_bystore(self,
+                           limit: int = None,
+                           offset: int = None,
+                           filters: str = None,
+                           expand: str = None,
+                           group_by: str = 'variant',
+                           query: Query = None
+                           ) -> dict:
+        """ Остатки по складам
+        https://dev.moysklad.ru/doc/api/remap/1.2/reports/#otchety-otchet-ostatki-poluchit-ostatki-po-skladam
+
+        Args:
+            limit (int, optional): Максимальное количество сущностей для
+            извлечения. Defaults to None.
+            offset (int, optional): Отступ в выдаваемом списке сущностей.
+            Defaults to None.
+            filters (str, optional): фильтры. Defaults to None.
+            group_by (str, optional): тип, по которому нужно сгруппировать
+            выдачу ('product', 'variant', 'consignment'). Defaults to 'variant'.
+            query (Query, optional): фильтры/expand через построитель запросов;
+            заменяет `filters` и `expand`. Defaults to None.
+
+        Returns:
+            dict: _description_
+        """
+        url = f'{self.MS_STOCKS_BASE_URL}/bystore'
+        payload = {
+            "limit": limit,
+            "offset": offset,
+            "groupBy": group_by,
+            "filter": filters,
+            "expand": expand
+        }
+        return self._get(url, payload, query)
+
+    def get_current_stocks(self,
+                           mode: str = 'all',
+                           stockType: str = 'stock',
+                           filters: str = None,
+                           expand: str = None,
+                           query: Query = None
+                           ) -> dict:
+        """ Текущие остатки
+        https://dev.moysklad.ru/doc/api/remap/1.2/reports/#otchety-otchet-ostatki-tekuschie-ostatki
+
+        Args:
+            mode (str, optional): `all` или `bystore`. Defaults to 'all'.
+            stockType (str, optional): `stock`, `freeStock`или `quantity`. Defaults to 'stock'.
+            filters (str, optional): `assortmentId` и `storeId`. Defaults to None.
+            query (Query, optional): обычно `CurrentStocksQuery`; заменяет
+            `filters` и `expand`, длинный список id делится на несколько
+            запросов. Defaults to None.
+
+        Returns:
+            dict: _description_
+        """
+        url = f'{self.MS_STOCKS_BASE_URL}/{mode}/current'
+        payload = {
+            "stockType": stockType,
+            "filter": filters,
+            "expand": expand
+        }
+        return self._get(url, payload, query)
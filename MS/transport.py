@@ -0,0 +1,74 @@
+""" Транспорт: коннектор МС и HTTP-сессия
+
+Сессия `requests` (и сам `requests`/`urllib3`) создаётся при первом
+обращении через `get_session`, а не при импорте пакета.
+"""
+from typing import Any, Dict, List
+
+
+# МС допускает не более 5 параллельных запросов от одного пользователя
+MAX_PARALLEL_REQUESTS = 5
+
+_session = None
+
+
+class MoySkladConnector:
+    """ Коннекто МС для формирования хедеров """
+    ms_base_url = 'https://online.moysklad.ru/api/remap/1.2'
+
+    def __init__(self, token: str):
+        self.token = token
+        self.ms_headers = {
+            "Authorization": self.token,
+            "Content-Type": "application/json",
+            "Connection": "keep-alive"
+        }
+
+
+def get_session():
+    """ Возвращает общую сессию, создавая её при первом вызове
+
+    Returns:
+        requests.Session: сессия с ретраями на подключение
+    """
+    global _session
+    if _session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util import Retry
+
+        session = requests.Session()
+        retry = Retry(connect=4, backoff_factor=1)
+        adapter = HTTPAdapter(max_retries=retry)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        _session = session
+    return _session
+
+
+def get_many(url: str, headers: Dict, params_list: List[Dict]) -> List[Any]:
+    """ Параллельные GET-запросы к одному адресу с разными параметрами
+
+    Args:
+        url (str): адрес запроса
+        headers (Dict): хедеры
+        params_list (List[Dict]): параметры для каждого запроса
+
+    Returns:
+        List[Any]: ответы (json) в порядке `params_list`
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    session = get_session()
+    if len(params_list) == 1:
+        return [session.get(url=url, headers=headers, params=params_list[0]).json()]
+    with ThreadPoolExecutor(max_workers=MAX_PARALLEL_REQUESTS) as executor:
+        return list(executor.map(
+            lambda params: session.get(url=url, headers=headers, params=params).json(),
+            params_list))
+
+
+def dumps(data: Any) -> str:
+    """ Сериализация тела запроса в json (ujson импортируется по требованию) """
+    import ujson
+    return ujson.dumps(data)
@@ -0,0 +1,56 @@
+""" Замер времени импорта пакета MS
+
+Каждый замер запускается в отдельном интерпретаторе, чтобы импорт
+был «холодным». Скрипт также проверяет, что `import MS` не тянет
+за собой requests/urllib3/ujson.
+
+    python benchmarks/bench_import.py [-n 20] [--budget 0.05]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('requests', 'urllib3', 'ujson')
+
+SNIPPET = f"""
+import sys, time
+t = time.perf_counter()
+import MS
+dt = time.perf_counter() - t
+heavy = [m for m in {HEAVY_MODULES!r} if m in sys.modules]
+print(dt, ','.join(heavy))
+"""
+
+
+def measure(runs: int) -> list:
+    """ Время `import MS` в секундах для каждого из `runs` запусков """
+    timings = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, '-c', SNIPPET],
+                             cwd=ROOT, capture_output=True, text=True, check=True).stdout.split()
+        if len(out) > 1:
+            raise SystemExit(f"import MS eagerly loaded: {out[1]}")
+        timings.append(float(out[0]))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-n', '--runs', type=int, default=20)
+    parser.add_argument('--budget', type=float, default=0.05,
+                        help='максимально допустимая медиана, сек')
+    args = parser.parse_args()
+    timings = measure(args.runs)
+    median = statistics.median(timings)
+    print(f"import MS: median {median * 1000:.2f} ms, "
+          f"min {min(timings) * 1000:.2f} ms, max {max(timings) * 1000:.2f} ms "
+          f"({args.runs} runs)")
+    if median > args.budget:
+        raise SystemExit(f"median import time exceeds budget of {args.budget * 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
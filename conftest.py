@@ -0,0 +1,2 @@
+# Корневой conftest: pytest добавляет каталог репозитория в sys.path,
+# поэтому `import MS` в tests/ работает и при запуске обычным `pytest`.
@@ -0,0 +1,163 @@
+from datetime import date, datetime
+
+import pytest
+
+from MS import (Assortment, CurrentStocksQuery, DemandsList, MoySkladConnector, ProductsList,
+                Query, Stocks)
+from MS.query import _serialize
+
+URL = 'https://online.moysklad.ru/api/remap/1.2/entity/demand'
+IDS = [f'{i:036d}' for i in range(200)]
+
+
+def test_serialize():
+    assert _serialize(None) == ''
+    assert _serialize(True) == 'true'
+    assert _serialize(datetime(2024, 1, 2, 3, 4, 5)) == '2024-01-02 03:04:05'
+    assert _serialize(date(2024, 1, 2)) == '2024-01-02 00:00:00'
+    assert _serialize({'meta': {'href': 'http://x/store/1'}}) == 'http://x/store/1'
+    assert _serialize(5) == '5'
+
+
+def test_params():
+    query = Query().filter('name', ['a', 'b']).filter('moment', date(2024, 1, 1), '>=') \
+        .order('moment', 'desc').order('name').search('foo').expand('agent', 'store') \
+        .limit(10).offset(5)
+    assert query.params() == {
+        'filter': 'name=a;name=b;moment>=2024-01-01 00:00:00',
+        'order': 'moment,desc;name,asc',
+        'search': 'foo',
+        'expand': 'agent,store',
+        'limit': 10,
+        'offset': 5,
+    }
+    assert CurrentStocksQuery().assortment_id('a', 'b').store_id('s').params() == {
+        'filter': 'assortmentId=a,b;storeId=s'
+    }
+
+
+def test_filter_rejects_unknown_operator():
+    with pytest.raises(ValueError):
+        Query().filter('name', 'a', '<>')
+
+
+def test_validate():
+    query = Query().filter('bogus', 1).filter('http://x/attributes/1', 2)
+    with pytest.raises(ValueError, match='bogus'):
+        query.validate(DemandsList.filter_fields, ['http://x/attributes/1'])
+    Query().filter('moment', 1).validate(DemandsList.filter_fields)
+    Query().filter('updatedBy', 'admin').filter('agentAccount', 'x') \
+        .validate(DemandsList.filter_fields)
+    Query().filter('uom', 'x').filter('isSerialTrackable', True) \
+        .validate(ProductsList.filter_fields)
+    Query().filter('stockStore', 'x').validate(Assortment.filter_fields)
+    with pytest.raises(ValueError):
+        Query().filter('bogus', 1).validate(Assortment.filter_fields)
+
+
+def test_validate_ignores_order_fields():
+    Query().filter('moment', 1).order('sum', 'desc').order('bogus') \
+        .validate(DemandsList.filter_fields)
+
+
+def test_split_keeps_short_query():
+    query = Query().filter('id', IDS[:3])
+    assert query.split(URL) == [query]
+
+
+def test_split_equal_condition():
+    query = Query().filter('moment', '2024-01-01', '>=').filter('id', IDS)
+    parts = query.split(URL, max_url_length=2000)
+    assert len(parts) > 1
+    assert all(part.url_length(URL) <= 2000 for part in parts)
+    assert sum(len(part._conditions[1].values) for part in parts) == len(IDS)
+    assert all(part.params()['filter'].startswith('moment>=2024-01-01;') for part in parts)
+
+
+def test_split_counts_extra_params():
+    query = Query().filter('id', IDS[:40])
+    extra = {'groupBy': 'variant', 'stockType': 'x' * 500}
+    assert query.split(URL, max_url_length=2000) == [query]
+    parts = query.split(URL, max_url_length=2000, extra=extra)
+    assert len(parts) > 1
+    assert all(part.url_length(URL, extra) <= 2000 for part in parts)
+
+
+def test_split_rejects_non_equal_operator():
+    with pytest.raises(ValueError):
+        Query().filter('id', IDS, '!=').split(URL, max_url_length=2000)
+
+
+def test_split_rejects_limit_offset():
+    with pytest.raises(ValueError):
+        Query().filter('id', IDS).limit(100).split(URL, max_url_length=2000)
+    with pytest.raises(ValueError):
+        Query().filter('id', IDS).offset(50).split(URL, max_url_length=2000)
+
+
+def test_split_comma_condition():
+    parts = CurrentStocksQuery().assortment_id(*IDS).split(URL, max_url_length=2000)
+    assert len(parts) > 1
+    assert sum(len(part._conditions[0].values) for part in parts) == len(IDS)
+
+
+def test_sort():
+    rows = [{'moment': '2024-01-02'}, {'moment': None}, {'moment': '2024-01-03'}]
+    assert Query().order('moment', 'desc').sort(rows) == [
+        {'moment': '2024-01-03'}, {'moment': '2024-01-02'}, {'moment': None}
+    ]
+
+
+def test_sort_mixed_types():
+    rows = [{'name': 'a'}, {'name': 1}, {'name': {'name': 'z'}}, {'name': [1]}]
+    assert Query().order('name').sort(rows) == [
+        {'name': 1}, {'name': 'a'}, {'name': {'name': 'z'}}, {'name': [1]}
+    ]
+
+
+def test_entities_list_merges_split_query(monkeypatch):
+    calls = []
+
+    def get_many(url, headers, params_list):
+        calls.extend(params_list)
+        responses = []
+        for params in params_list:
+            ids = [c.split('=')[1] for c in params['filter'].split(';')]
+            rows = [{'id': i, 'moment': i} for i in ids] + [{'id': 'dup', 'moment': ''}]
+            responses.append({'rows': rows, 'meta': {}})
+        return responses
+
+    monkeypatch.setattr('MS.lists.get_many', get_many)
+    query = Query().filter('id', IDS).order('moment', 'desc')
+    rows = DemandsList(MoySkladConnector('token')).get(query=query)
+    assert len(calls) > 1
+    assert len(rows) == len(IDS) + 1
+    assert [row['id'] for row in rows[:len(IDS)]] == sorted(IDS, reverse=True)
+
+
+def test_stocks_merges_split_query(monkeypatch):
+    def get_many(url, headers, params_list):
+        return [{'context': {},
+                 'rows': [{'id': params['filter']}],
+                 'meta': {'size': 2, 'limit': 1000, 'offset': 0,
+                          'nextHref': f"next:{params['filter']}"}}
+                for params in params_list]
+
+    class Session:
+        def get(self, url, headers):
+            class Response:
+                def json(self):
+                    return {'rows': [{'id': url}], 'meta': {'size': 2}}
+            return Response()
+
+    monkeypatch.setattr('MS.stocks.get_many', get_many)
+    monkeypatch.setattr('MS.stocks.get_session', Session)
+    stocks = Stocks(MoySkladConnector('token'))
+    query = Query().filter('product', IDS * 2)
+    result = stocks.get_stocks(query=query)
+    parts = len(result['rows']) // 2
+    assert parts > 1
+    assert result['meta'] == {'size': len(result['rows'])}
+    assert sum(row['id'].startswith('next:') for row in result['rows']) == parts
+    with pytest.raises(ValueError):
+        stocks.get_stocks(limit=10, query=query)
@@ -0,0 +1,189 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from MS import MoySkladConnector, Query, ReportCache, Reports
+from MS.reports import MSK, _periods, merge_profit, merge_turnover
+
+URL = 'https://online.moysklad.ru/api/remap/1.2/report/profit/byproduct'
+
+
+def assortment(href):
+    return {'meta': {'href': href}}
+
+
+def test_periods_month():
+    assert _periods(datetime(2023, 11, 15), datetime(2024, 1, 10), 'month') == [
+        (datetime(2023, 11, 15), datetime(2023, 11, 30, 23, 59, 59)),
+        (datetime(2023, 12, 1), datetime(2023, 12, 31, 23, 59, 59)),
+        (datetime(2024, 1, 1), datetime(2024, 1, 10)),
+    ]
+
+
+def test_periods_day():
+    assert _periods(datetime(2024, 2, 28, 12), datetime(2024, 3, 1, 5), 'day') == [
+        (datetime(2024, 2, 28, 12), datetime(2024, 2, 28, 23, 59, 59)),
+        (datetime(2024, 2, 29), datetime(2024, 2, 29, 23, 59, 59)),
+        (datetime(2024, 3, 1), datetime(2024, 3, 1, 5)),
+    ]
+
+
+def test_periods_unknown_bucket():
+    with pytest.raises(ValueError):
+        _periods(datetime(2024, 1, 1), datetime(2024, 2, 1), 'week')
+
+
+def test_merge_profit():
+    rows = merge_profit([
+        [{'assortment': assortment('a'), 'sellQuantity': 2, 'sellSum': 20,
+          'sellCostSum': 10, 'profit': 10}],
+        [{'assortment': assortment('a'), 'sellQuantity': 2, 'sellSum': 40, 'sellCostSum': 20,
+          'returnQuantity': 1, 'returnSum': 10, 'returnCostSum': 5, 'profit': 15},
+         {'assortment': assortment('b'), 'sellQuantity': 0, 'profit': 0}],
+    ])
+    a, b = rows
+    assert a['sellQuantity'] == 4 and a['sellSum'] == 60 and a['profit'] == 25
+    assert a['sellPrice'] == 15 and a['sellCost'] == 7.5 and a['returnPrice'] == 10
+    assert a['margin'] == 25 / 25 and a['salesMargin'] == 25 / 50
+    assert b['sellPrice'] == 0 and b['margin'] == 0
+
+
+def test_merge_turnover():
+    def row(href, start, end, income, outcome):
+        return {'assortment': assortment(href),
+                'onPeriodStart': {'quantity': start, 'sum': start},
+                'onPeriodEnd': {'quantity': end, 'sum': end},
+                'income': {'quantity': income, 'sum': income},
+                'outcome': {'quantity': outcome, 'sum': outcome}}
+
+    [merged] = merge_turnover([[row('a', 1, 3, 4, 2)], [row('a', 3, 2, 0, 1)]])
+    assert merged['onPeriodStart']['quantity'] == 1
+    assert merged['onPeriodEnd']['quantity'] == 2
+    assert merged['income']['quantity'] == 4 and merged['outcome']['quantity'] == 3
+
+
+class Fetch:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, url, params):
+        self.calls.append((params['momentFrom'], params['momentTo']))
+        return [params['momentFrom']]
+
+
+def month_start(months_ago):
+    now = datetime.now(MSK).replace(tzinfo=None)
+    year, month = now.year, now.month - months_ago
+    while month < 1:
+        year, month = year - 1, month + 12
+    return datetime(year, month, 1)
+
+
+def test_by_period_caches_closed_buckets_only():
+    cache = ReportCache()
+    moment_from, moment_to = month_start(3), datetime.now(MSK).replace(tzinfo=None)
+    fetch = Fetch()
+    reports = Reports(MoySkladConnector('token'), cache)
+    first = reports.by_period(URL, moment_from, moment_to, fetch=fetch)
+    assert len(fetch.calls) == 4
+    fetch.calls.clear()
+    second = reports.by_period(URL, moment_from, moment_to, fetch=fetch)
+    assert fetch.calls == [(month_start(0).strftime('%Y-%m-%d %H:%M:%S'),
+                            moment_to.strftime('%Y-%m-%d %H:%M:%S'))]
+    assert first == second
+
+
+def test_by_period_skips_partial_buckets():
+    cache = ReportCache()
+    fetch = Fetch()
+    reports = Reports(MoySkladConnector('token'), cache)
+    moment_from = month_start(3) + timedelta(days=10, seconds=1)
+    reports.by_period(URL, moment_from, month_start(1) + timedelta(days=5), fetch=fetch)
+    assert len(cache._memory) == 1
+    reports.by_period(URL, moment_from + timedelta(seconds=1),
+                      month_start(1) + timedelta(days=5), fetch=fetch)
+    assert len(cache._memory) == 1
+    assert len(fetch.calls) == 5
+
+
+def test_by_period_refresh_from():
+    cache = ReportCache()
+    fetch = Fetch()
+    reports = Reports(MoySkladConnector('token'), cache)
+    moment_from, moment_to = month_start(3), month_start(1) - timedelta(seconds=1)
+    reports.by_period(URL, moment_from, moment_to, fetch=fetch)
+    fetch.calls.clear()
+    reports.by_period(URL, moment_from, moment_to, fetch=fetch,
+                      refresh_from=month_start(2) + timedelta(days=3))
+    assert [start for start, _ in fetch.calls] == [month_start(2).strftime('%Y-%m-%d %H:%M:%S')]
+
+
+def test_cache_is_per_account(tmp_path):
+    moment_from, moment_to = month_start(3), month_start(1) - timedelta(seconds=1)
+    fetch_a, fetch_b = Fetch(), Fetch()
+    Reports(MoySkladConnector('tokenA'), ReportCache(str(tmp_path))) \
+        .by_period(URL, moment_from, moment_to, fetch=fetch_a)
+    Reports(MoySkladConnector('tokenB'), ReportCache(str(tmp_path))) \
+        .by_period(URL, moment_from, moment_to, fetch=fetch_b)
+    assert len(fetch_a.calls) == len(fetch_b.calls) == 2
+    fetch_a.calls.clear()
+    Reports(MoySkladConnector('tokenA'), ReportCache(str(tmp_path))) \
+        .by_period(URL, moment_from, moment_to, fetch=fetch_a)
+    assert fetch_a.calls == []
+
+
+def test_cache_clear(tmp_path):
+    cache = ReportCache(str(tmp_path))
+    cache.set('key', [1])
+    cache.clear()
+    assert cache.get('key') is None
+    assert ReportCache(str(tmp_path)).get('key') is None
+
+
+def test_sales_interval_coarser_than_bucket():
+    reports = Reports(MoySkladConnector('token'))
+    with pytest.raises(ValueError):
+        reports.sales_by_period(month_start(2), month_start(1), interval='month', bucket='day')
+    with pytest.raises(ValueError):
+        reports.sales_by_period(month_start(2), month_start(1), interval='week')
+
+
+def test_cache_treats_broken_file_as_miss(tmp_path):
+    (tmp_path / 'key.json').write_text('{"rows": [', encoding='utf-8')
+    cache = ReportCache(str(tmp_path))
+    assert cache.get('key') is None
+    cache.set('key', [1])
+    assert ReportCache(str(tmp_path)).get('key') == [1]
+    assert [p.name for p in tmp_path.iterdir()] == ['key.json']
+
+
+def test_sales_unknown_bucket():
+    with pytest.raises(ValueError, match='bucket'):
+        Reports(MoySkladConnector('token')).sales_by_period(
+            month_start(2), month_start(1), bucket='week')
+
+
+def test_query_with_limit_offset_rejected():
+    reports = Reports(MoySkladConnector('token'))
+    with pytest.raises(ValueError):
+        reports.profit_by_product(month_start(2), month_start(1), Query().limit(10))
+    with pytest.raises(ValueError):
+        reports.turnover(month_start(2), month_start(1), query=Query().offset(10))
+    with pytest.raises(ValueError):
+        next(reports.stream(URL, {'limit': 10}))
+
+
+def test_page_size_limits():
+    with pytest.raises(ValueError):
+        Reports(MoySkladConnector('token'), page_size=1001)
+    with pytest.raises(ValueError):
+        Reports(MoySkladConnector('token'), page_size=0)
+
+
+def test_by_period_converts_aware_datetimes():
+    fetch = Fetch()
+    reports = Reports(MoySkladConnector('token'))
+    moment_from = datetime(2024, 1, 31, 22, tzinfo=timezone.utc)
+    moment_to = datetime(2024, 2, 1, 20, 59, 59, tzinfo=timezone.utc)
+    reports.by_period(URL, moment_from, moment_to, fetch=fetch)
+    assert fetch.calls == [('2024-02-01 01:00:00', '2024-02-01 23:59:59')]